@@ -1,12 +1,63 @@
-import json
+import fnmatch
+import orjson
+import time
 import redis
+from collections import OrderedDict
+from threading import Lock
 from typing import Any, Optional
 from app.core.config import settings
 
+# Upper bound on local cache entry lifetime (seconds). Keeping it short
+# bounds staleness against cross-process invalidation while still
+# absorbing bursts of identical lookups.
+LOCAL_CACHE_TTL = 60
+
+
+class LocalLRUCache:
+    """Process-local LRU cache with per-entry TTL.
+
+    Acts as an L1 in front of Redis: repeated lookups for hot keys skip
+    the network round-trip entirely. Values are stored serialized so hits
+    behave exactly like Redis hits (callers always get a fresh object).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if fnmatch.fnmatch(k, pattern)]:
+                del self._entries[key]
+
 
 class CacheManager:
     """Redis cache manager for storing scraping results."""
-    
+
     def __init__(self):
         self.redis_client = redis.from_url(
             settings.redis_url,
@@ -15,42 +66,51 @@ class CacheManager:
             socket_timeout=5,
             retry_on_timeout=True
         )
-    
+        self.local_cache = LocalLRUCache(maxsize=1024)
+
     def get(self, key: str) -> Optional[Any]:
-        """Get cached data by key."""
+        """Get cached data by key, checking the local LRU before Redis."""
         try:
-            cached_data = self.redis_client.get(key)
+            cached_data = self.local_cache.get(key)
+            if cached_data is None:
+                cached_data = self.redis_client.get(key)
+                if cached_data:
+                    # Populate the local cache so repeat lookups skip Redis
+                    self.local_cache.put(key, cached_data, ttl=LOCAL_CACHE_TTL)
             if cached_data:
-                result = json.loads(cached_data)
+                result = orjson.loads(cached_data)
                 # Mark as cached
                 if isinstance(result, dict) and 'metadata' in result:
                     result['metadata']['cached'] = True
                 return result
             return None
-        except (redis.RedisError, json.JSONDecodeError) as e:
+        except (redis.RedisError, orjson.JSONDecodeError) as e:
             print(f"Cache get error: {e}")
             return None
-    
+
     def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Set cached data with TTL."""
         try:
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = orjson.dumps(value, default=str)
+            self.local_cache.put(key, serialized_value, ttl=min(ttl, LOCAL_CACHE_TTL))
             return self.redis_client.setex(key, ttl, serialized_value)
         except (redis.RedisError, TypeError) as e:
             print(f"Cache set error: {e}")
             return False
-    
+
     def delete(self, key: str) -> bool:
         """Delete cached data by key."""
         try:
+            self.local_cache.delete(key)
             return bool(self.redis_client.delete(key))
         except redis.RedisError as e:
             print(f"Cache delete error: {e}")
             return False
-    
+
     def invalidate_pattern(self, pattern: str) -> int:
         """Invalidate all keys matching a pattern."""
         try:
+            self.local_cache.delete_pattern(pattern)
             keys = self.redis_client.keys(pattern)
             if keys:
                 return self.redis_client.delete(*keys)
@@ -1,16 +1,44 @@
 import time
 import asyncio
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 from celery import current_task
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.worker.celery_app import celery_app
-from app.scraper.twitter_scraper import TwitterScraper
+from app.scraper.twitter_scraper import TwitterScraper, get_twitter_scraper
 from app.core.security import security_manager
 from app.core.exceptions import ScrapingException
 from app.db.session import AsyncSessionLocal
 from app.crud.crud_settings import settings_crud
 
+# Decrypted credentials stay cached briefly so repeated tasks for the
+# same credential skip the DB round-trip and the (deliberately slow) KDF
+_CREDS_TTL = 300.0
+_creds_cache: Dict[str, tuple] = {}
+_creds_lock = threading.Lock()
+
+# One long-lived event loop on a background thread; asyncio.run built
+# and tore down a fresh loop for every task
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="tasks-loop", daemon=True
+            ).start()
+    return _loop
+
+
+def _run_async(coro):
+    """Run a coroutine on the shared background loop and wait for it."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
 
 async def get_credentials(credential_name: str) -> tuple[str, str]:
     """Get decrypted credentials from database."""
@@ -31,6 +59,19 @@ async def get_credentials(credential_name: str) -> tuple[str, str]:
         return credentials.username, password
 
 
+def get_cached_credentials(credential_name: str) -> tuple[str, str]:
+    """Get decrypted credentials, serving repeats from the process cache."""
+    now = time.monotonic()
+    with _creds_lock:
+        entry = _creds_cache.get(credential_name)
+        if entry and now - entry[0] < _CREDS_TTL:
+            return entry[1]
+    creds = _run_async(get_credentials(credential_name))
+    with _creds_lock:
+        _creds_cache[credential_name] = (now, creds)
+    return creds
+
+
 def update_task_progress(progress: int, message: str = None):
     """Update task progress."""
     if current_task:
@@ -46,9 +87,8 @@ def login_task(self, credential_name: str):
     try:
         update_task_progress(10, "Retrieving credentials")
         
-        # Get credentials (we need to handle async in sync context)
-        import asyncio
-        username, password = asyncio.run(get_credentials(credential_name))
+        # Get credentials (async DB lookup runs on the shared loop)
+        username, password = get_cached_credentials(credential_name)
         
         update_task_progress(30, "Initializing scraper")
         
@@ -87,8 +127,9 @@ def search_users_task(self, query: str, limit: int = 20):
     try:
         update_task_progress(10, "Initializing scraper")
         
-        # Create scraper instance (assumes login state exists)
-        scraper = TwitterScraper(headless=True)
+        # Shared scraper instance (assumes login state exists); its
+        # pooled browser survives across tasks in this worker child
+        scraper = get_twitter_scraper()
         
         update_task_progress(30, f"Searching for users: {query}")
         
@@ -118,8 +159,9 @@ def get_following_task(self, username: str, limit: int = 20):
     try:
         update_task_progress(10, "Initializing scraper")
         
-        # Create scraper instance
-        scraper = TwitterScraper(headless=True)
+        # Shared scraper instance; its pooled browser survives across
+        # tasks in this worker child
+        scraper = get_twitter_scraper()
         
         update_task_progress(30, f"Getting following list for: {username}")
         
@@ -149,8 +191,9 @@ def get_followers_task(self, username: str, limit: int = 20):
     try:
         update_task_progress(10, "Initializing scraper")
         
-        # Create scraper instance
-        scraper = TwitterScraper(headless=True)
+        # Shared scraper instance; its pooled browser survives across
+        # tasks in this worker child
+        scraper = get_twitter_scraper()
         
         update_task_progress(30, f"Getting followers list for: {username}")
         
@@ -180,8 +223,9 @@ def get_timeline_task(self, username: str, count: int = 80, include_analysis: bo
     try:
         update_task_progress(10, "Initializing scraper")
         
-        # Create scraper instance
-        scraper = TwitterScraper(headless=True)
+        # Shared scraper instance; its pooled browser survives across
+        # tasks in this worker child
+        scraper = get_twitter_scraper()
         
         update_task_progress(30, f"Getting timeline for: {username}")
         
@@ -214,6 +258,51 @@ def get_timeline_task(self, username: str, count: int = 80, include_analysis: bo
         raise Exception(f"Get timeline failed for '{username}': {str(e)}")
 
 
+@celery_app.task(bind=True, name="app.worker.tasks.get_full_profile_task")
+def get_full_profile_task(self, username: str, timeline_count: int = 80, list_limit: int = 20):
+    """Background task fetching following, followers and timeline in one go.
+
+    Clients that want a full profile used to queue three separate tasks,
+    each paying scraper setup and login-check overhead. This runs all
+    three against the shared scraper: the two list scrapes overlap on
+    the snapshot executor and the timeline follows, with one login
+    verification covering everything.
+    """
+    try:
+        update_task_progress(10, "Initializing scraper")
+
+        # Shared scraper instance; its pooled browser survives across
+        # tasks in this worker child
+        scraper = get_twitter_scraper()
+
+        update_task_progress(25, f"Getting follower/following lists for: {username}")
+        snapshot = scraper.profile_snapshot(username, list_limit)
+
+        update_task_progress(60, f"Getting timeline for: {username}")
+        timeline = scraper.timeline_tweet(username, timeline_count)
+
+        update_task_progress(100, f"Full profile retrieved for: {username}")
+
+        return {
+            "following": snapshot["following"],
+            "followers": snapshot["followers"],
+            "timeline": timeline,
+        }
+
+    except Exception as e:
+        # Return error info in a structured way
+        error_info = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'username': username,
+            'timeline_count': timeline_count,
+            'list_limit': list_limit,
+            'failed_at': time.time()
+        }
+        raise Exception(f"Get full profile failed for '{username}': {str(e)}")
+
+
 @celery_app.task(bind=True, name="app.worker.tasks.test_task")
 def test_task(self, message: str = "Hello from Celery!"):
     """Test task to verify Celery is working properly."""
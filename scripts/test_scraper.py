@@ -2,9 +2,13 @@
 """
 Standalone Twitter scraper testing script
 """
+import argparse
+import getpass
+import os
 import sys
-import json
 import asyncio
+
+import orjson
 from pathlib import Path
 
 # Add the app directory to the Python path
@@ -12,19 +16,107 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from app.scraper.twitter_scraper import TwitterScraper
 from app.core.config import settings
+from app.core.exceptions import ScrapingException
+
+
+def dump_result(result):
+    """Pretty-print a result as JSON straight to the byte stream."""
+    sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
+
+
+def parse_args(argv=None):
+    """Parse batch-mode arguments; no args means interactive mode."""
+    parser = argparse.ArgumentParser(
+        description="Twitter scraper test harness. Pass --users to run a "
+                    "batch of operations concurrently; run with no "
+                    "arguments for the interactive menu."
+    )
+    parser.add_argument("--users", nargs="+", metavar="USER",
+                        help="usernames (or queries for --op search) to process")
+    parser.add_argument("--op", default="timeline",
+                        choices=("timeline", "search", "following", "followers"),
+                        help="operation to run for each user (default: timeline)")
+    parser.add_argument("--count", type=int, default=80,
+                        help="tweet count for --op timeline (default: 80)")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="result limit for search/following/followers (default: 20)")
+    return parser.parse_args(argv)
+
+
+async def make_scraper():
+    """Build a scraper from TWITTER_USER/TWITTER_PASS, prompting as a fallback.
+
+    Environment variables let the script run non-interactively (CI,
+    benchmarks); the password prompt uses getpass so nothing is echoed.
+    """
+    username = os.getenv("TWITTER_USER") or await asyncio.to_thread(
+        input, "Enter Twitter username: "
+    )
+    password = os.getenv("TWITTER_PASS") or await asyncio.to_thread(
+        getpass.getpass, "Enter Twitter password: "
+    )
+    return TwitterScraper(headless=True, username=username, password=password)
+
+
+def _run_op(scraper, op, user, args):
+    if op == "timeline":
+        return scraper.timeline_tweet(user, args.count)
+    if op == "following":
+        return scraper.following_user(user, args.limit)
+    if op == "followers":
+        return scraper.followers_user(user, args.limit)
+    return scraper.search_user(user, args.limit)
+
+
+def _emit_jsonl(user, op, result):
+    """Stream one completed result as JSONL, tweet-per-line for timelines."""
+    out = sys.stdout.buffer
+    if op == "timeline" and isinstance(result, dict):
+        for tweet in result.get("timelines", []):
+            out.write(orjson.dumps({"user": user, "tweet": tweet}) + b"\n")
+    else:
+        out.write(orjson.dumps({"user": user, "op": op, "result": result}) + b"\n")
+    out.flush()
+
+
+async def run_batch(args):
+    """Run one operation for every user concurrently, streaming JSONL.
+
+    All scrapes are dispatched at once under a TaskGroup, so the wall
+    clock is bounded by the slowest target instead of the sum. Each
+    result is written the moment its scrape finishes rather than after
+    the whole batch, so downstream pipes see output immediately and no
+    batch-wide result list accumulates in memory.
+    """
+    scraper = await make_scraper()
+
+    async def scrape_and_emit(user):
+        # A failed user becomes an error line instead of an exception
+        # that would make the TaskGroup cancel the rest of the batch
+        try:
+            result = await asyncio.to_thread(_run_op, scraper, args.op, user, args)
+        except ScrapingException as e:
+            out = sys.stdout.buffer
+            out.write(orjson.dumps({"user": user, "op": args.op, "error": str(e)}) + b"\n")
+            out.flush()
+            return
+        _emit_jsonl(user, args.op, result)
+
+    async with asyncio.TaskGroup() as tg:
+        for user in args.users:
+            tg.create_task(scrape_and_emit(user))
 
 
 async def test_scraper():
     """Test the Twitter scraper functionality."""
     print("Twitter Scraper Test")
     print("===================")
-    
+
     # Initialize scraper
-    username = input("Enter Twitter username: ")
-    password = input("Enter Twitter password: ")
-    
-    scraper = TwitterScraper(headless=True, username=username, password=password)
-    
+    scraper = await make_scraper()
+
     while True:
         print("\nSelect an option:")
         print("1. Login")
@@ -32,45 +124,58 @@ async def test_scraper():
         print("3. Get following list")
         print("4. Get followers list")
         print("5. Get timeline")
-        print("6. Exit")
-        
-        choice = input("Enter choice (1-6): ")
+        print("6. Get followers + following (concurrent)")
+        print("7. Exit")
+
+        choice = await asyncio.to_thread(input, "Enter choice (1-7): ")
         
         try:
             if choice == "1":
                 print("Logging in...")
-                scraper.login()
+                await asyncio.to_thread(scraper.login)
                 print("Login successful!")
-                
+
             elif choice == "2":
-                query = input("Enter search query: ")
-                limit = int(input("Enter limit (default 20): ") or "20")
+                query = await asyncio.to_thread(input, "Enter search query: ")
+                limit = int(await asyncio.to_thread(input, "Enter limit (default 20): ") or "20")
                 print(f"Searching for users: {query}")
-                result = scraper.search_user(query, limit)
-                print(json.dumps(result, indent=2))
-                
+                result = await scraper.search_user_async(query, limit)
+                dump_result(result)
+
             elif choice == "3":
-                target_username = input("Enter username: ")
-                limit = int(input("Enter limit (default 20): ") or "20")
+                target_username = await asyncio.to_thread(input, "Enter username: ")
+                limit = int(await asyncio.to_thread(input, "Enter limit (default 20): ") or "20")
                 print(f"Getting following list for: {target_username}")
-                result = scraper.following_user(target_username, limit)
-                print(json.dumps(result, indent=2))
-                
+                result = await asyncio.to_thread(scraper.following_user, target_username, limit)
+                dump_result(result)
+
             elif choice == "4":
-                target_username = input("Enter username: ")
-                limit = int(input("Enter limit (default 20): ") or "20")
+                target_username = await asyncio.to_thread(input, "Enter username: ")
+                limit = int(await asyncio.to_thread(input, "Enter limit (default 20): ") or "20")
                 print(f"Getting followers list for: {target_username}")
-                result = scraper.followers_user(target_username, limit)
-                print(json.dumps(result, indent=2))
-                
+                result = await asyncio.to_thread(scraper.followers_user, target_username, limit)
+                dump_result(result)
+
             elif choice == "5":
-                target_username = input("Enter username: ")
-                count = int(input("Enter tweet count (default 80): ") or "80")
+                target_username = await asyncio.to_thread(input, "Enter username: ")
+                count = int(await asyncio.to_thread(input, "Enter tweet count (default 80): ") or "80")
                 print(f"Getting timeline for: {target_username}")
-                result = scraper.timeline_tweet(target_username, count)
-                print(json.dumps(result, indent=2))
+                result = await asyncio.to_thread(scraper.timeline_tweet, target_username, count)
+                dump_result(result)
                 
             elif choice == "6":
+                target_username = await asyncio.to_thread(input, "Enter username: ")
+                limit = int(await asyncio.to_thread(input, "Enter limit (default 20): ") or "20")
+                print(f"Getting followers and following concurrently for: {target_username}")
+                # Both scrapes overlap; wall-clock is the slower of the
+                # two instead of their sum
+                followers, following = await asyncio.gather(
+                    asyncio.to_thread(scraper.followers_user, target_username, limit),
+                    asyncio.to_thread(scraper.following_user, target_username, limit),
+                )
+                dump_result({"followers": followers, "following": following})
+
+            elif choice == "7":
                 print("Goodbye!")
                 break
                 
@@ -82,4 +187,8 @@ async def test_scraper():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_scraper())
+    args = parse_args()
+    if args.users:
+        asyncio.run(run_batch(args))
+    else:
+        asyncio.run(test_scraper())